@@ -18,7 +18,8 @@ class TicketingSystem():
         self.current_order = {}
         
         self.main_database = MainDatabase()
-        self.portal_object = UserPortal(self.main_database)
+        self.gate_object = GateCheckIn(self.main_database)
+        self.portal_object = UserPortal(self.main_database, self.gate_object)
 
         dtype("Launching program...")
         time.sleep(1)
@@ -31,6 +32,11 @@ class TicketingSystem():
         print()
         time.sleep(1)
 
+        dtype("Loading gate ticket index...")
+        self.gate_object.load_index()
+        print()
+        time.sleep(1)
+
         dtype("Clearing screen and entering main program...")
         time.sleep(1)
         clear_screen()
@@ -131,13 +137,15 @@ class TicketingSystem():
             print()
 
             self.current_order["date_ordered"] = int(time.time())
+            ticket_id = self.main_database.add_ticket(self.current_order)   #update database with new ticket
+            self.gate_object.add_ticket()
+            self.current_order["ticket_code"] = self.gate_object.ticket_code(ticket_id)
             display_ticket(self.current_order)
             time.sleep(0.5)
 
             self.customers += (adult_tickets
                                + child_tickets
                                + senior_tickets)   #update customer count
-            self.main_database.add_ticket(self.current_order)   #update database with new ticket
 
             print()
             dtype("Thank you for booking at Copington Adventure Theme Park!")
@@ -147,6 +155,9 @@ class TicketingSystem():
             clear_screen()
 
         dtype("Closing database...")
+        self.gate_object.stop()
+        if self.gate_object.pending_redemptions:
+            dtype(f"Warning: {len(self.gate_object.pending_redemptions)} gate redemption/s could not be saved.")
         self.main_database.database_connection.close()
         time.sleep(1)
 
@@ -1,4 +1,5 @@
 """Import functions from the current directory."""
 from .database import *
 from .display import *
+from .gate import *
 from .portal import *
\ No newline at end of file
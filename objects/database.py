@@ -1,6 +1,7 @@
 """All functions involving the database."""
 import bcrypt
 import hashlib
+import secrets
 import sqlite3
 import time
 
@@ -28,6 +29,9 @@ class MainDatabase():
             "wristband": 20,
             }
 
+        #gate variables - secret used to sign ticket codes, loaded or created on connection
+        self.ticket_secret = ""
+
     def connect_database(self) -> None:
         """Connect to the main database and create default values if the database is new."""
         try:
@@ -55,6 +59,18 @@ class MainDatabase():
                 for item, price in price_rows:
                     self.entrance_prices[item] = price
 
+            #gate tables are created separately so databases made by older versions are upgraded
+            self.database_cursor.execute("CREATE TABLE IF NOT EXISTS redemptions (id INTEGER PRIMARY KEY, ticket_id INTEGER UNIQUE, date_redeemed INTEGER);")
+            self.database_cursor.execute("CREATE TABLE IF NOT EXISTS settings (item TEXT PRIMARY KEY, value TEXT);")
+            secret_row = self.database_cursor.execute("SELECT value FROM settings WHERE item = 'ticket_secret';").fetchone()
+            if secret_row:
+                self.ticket_secret = secret_row[0]
+            else:
+                self.ticket_secret = secrets.token_hex(16)
+                self.database_cursor.execute("INSERT INTO settings VALUES ('ticket_secret', ?);", (self.ticket_secret,))
+
+            self.database_connection.commit()
+
         except Exception as error:
             print("Database connection unsuccessful.")
             print(f"Error: {error}")
@@ -63,8 +79,8 @@ class MainDatabase():
             time.sleep(0.5)
             exit()
 
-    def add_ticket(self, values: dict) -> None:
-        """Add a ticket to the database."""
+    def add_ticket(self, values: dict) -> int:
+        """Add a ticket to the database and return its id."""
         self.database_cursor.execute("INSERT INTO tickets (adult_tickets, child_tickets"
                                      + ", senior_tickets, wristbands, surname, parking_pass_required"
                                      + ", total_cost, date_ordered) VALUES (?, ?, ?, ?, ?, ?, ?, ?);", 
@@ -73,6 +89,17 @@ class MainDatabase():
                                       values['total_cost'], values['date_ordered']))
         
         self.database_connection.commit()
+        return self.database_cursor.lastrowid
+
+    def add_redemptions(self, redemptions: list) -> int:
+        """Add a batch of (ticket id, date redeemed) rows to the database.
+        Returns the number of rows inserted - tickets already redeemed elsewhere are skipped.
+        """
+        self.database_cursor.executemany("INSERT OR IGNORE INTO redemptions (ticket_id, date_redeemed) VALUES (?, ?);", redemptions)
+        inserted = self.database_cursor.rowcount
+
+        self.database_connection.commit()
+        return inserted
 
     def add_user(self, username: str, password: str, salt: str, privilege: int) -> None:
         """Add a new user into the database."""
@@ -116,6 +143,25 @@ class MainDatabase():
         self.database_cursor.execute("SELECT * FROM tickets ORDER BY id DESC LIMIT ?;", (tickets,))
         return self.database_cursor.fetchall()
     
+    def return_tickets_after(self, after_id: int, tickets: int) -> list:
+        """Query and return up to x amount of tickets newer than after_id, oldest first."""
+        self.database_cursor.execute("SELECT * FROM tickets WHERE id > ? ORDER BY id LIMIT ?;", (after_id, tickets))
+        return self.database_cursor.fetchall()
+
+    def return_ticket_guests(self, after_id: int) -> list:
+        """Query and return the id and number of guests of every ticket newer than after_id."""
+        self.database_cursor.execute("SELECT id, adult_tickets + child_tickets + senior_tickets FROM tickets"
+                                     + " WHERE id > ? ORDER BY id;", (after_id,))
+        return self.database_cursor.fetchall()
+
+    def return_redemptions_after(self, after_id: int) -> list:
+        """Query and return the id, ticket id, date redeemed and number of guests of every redemption newer than after_id."""
+        self.database_cursor.execute("SELECT redemptions.id, ticket_id, date_redeemed"
+                                     + ", adult_tickets + child_tickets + senior_tickets"
+                                     + " FROM redemptions JOIN tickets ON tickets.id = redemptions.ticket_id"
+                                     + " WHERE redemptions.id > ? ORDER BY redemptions.id;", (after_id,))
+        return self.database_cursor.fetchall()
+    
     def delete_user(self, id: int) -> None:
         """Delete a user from the database."""
         self.database_cursor.execute("DELETE FROM users WHERE id = ?;", (id,))
@@ -83,4 +83,6 @@ def display_ticket(values: dict, slow_type: bool = True) -> None:
         print_method(f"{'Surname':<{left_align}} : {values['surname']}")
         print_method(f"{'Parking pass':<{left_align}} : {'Yes' if values['parking_pass_required'] else 'No'}")
         print_method(f"{'Total cost':<{left_align}} : £{values['total_cost']:.2f}")
-        print_method(f"{'Date ordered':<{left_align}} : {date_ordered}")
\ No newline at end of file
+        print_method(f"{'Date ordered':<{left_align}} : {date_ordered}")
+        if "ticket_code" in values:
+            print_method(f"{'Ticket code':<{left_align}} : {values['ticket_code']}")
\ No newline at end of file
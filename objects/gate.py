@@ -0,0 +1,199 @@
+"""Gate check-in functions."""
+import hashlib
+import hmac
+import sqlite3
+import threading
+import time
+
+from .database import (
+    MainDatabase,
+)
+
+class GateCheckIn():
+    """Main class for validating and redeeming ticket codes at the gate.
+    Valid and redeemed tickets are held in memory so each scan avoids the database.
+    A background thread with its own connection writes redemptions in batches and
+    picks up tickets and redemptions made by other kiosks and gates.
+    """
+    def __init__(self, main_database):
+        """Initialisation for variables."""
+        #constants
+        self.REDEMPTION_BATCH_SIZE = 20
+        self.SYNC_INTERVAL = 5   #seconds between background writes and refreshes
+        self.CODE_LENGTH = 8   #characters of the signature kept in a ticket code
+        self.MAXIMUM_ID_LENGTH = 19   #digits in the largest SQLite integer
+
+        #in-memory index variables
+        self.secret = b""
+        self.valid_tickets = {}   #ticket id: number of guests
+        self.redeemed_tickets = set()
+        self.latest_ticket_id = 0
+        self.latest_redemption_id = 0
+        self.pending_redemptions = []   #(ticket id, UNIX time) rows not yet written
+        self.duplicate_admissions = 0   #tickets admitted here that another gate had already redeemed
+
+        #headcount variables - guests admitted since the start of the current day (GMT)
+        self.headcount = 0
+        self.headcount_day = 0
+
+        #background sync variables
+        self.index_lock = threading.Lock()
+        self.sync_event = threading.Event()   #set to wake the sync thread early
+        self.stopping = False
+        self.sync_thread = None
+        self.sync_error = ""   #last background sync failure, empty while syncing normally
+
+        self.main_database = main_database
+
+    def load_index(self) -> None:
+        """Warm the in-memory index from the database and start the sync thread. Must be called after connecting."""
+        self.secret = self.main_database.ticket_secret.encode("utf-8")
+        self.headcount_day = self.current_day()
+        self.refresh_tickets(self.main_database)
+        self.refresh_redemptions(self.main_database)
+
+        self.sync_thread = threading.Thread(target=self.sync_loop, daemon=True)
+        self.sync_thread.start()
+
+    def stop(self) -> None:
+        """Stop the sync thread after a final attempt to write pending redemptions."""
+        self.stopping = True
+        self.sync_event.set()
+        if self.sync_thread:
+            self.sync_thread.join()
+
+    def refresh_tickets(self, database: MainDatabase) -> None:
+        """Add tickets sold since the index was last updated."""
+        rows = database.return_ticket_guests(self.latest_ticket_id)
+        with self.index_lock:
+            for ticket_id, guests in rows:
+                self.valid_tickets[ticket_id] = guests
+                self.latest_ticket_id = max(self.latest_ticket_id, ticket_id)
+
+    def refresh_redemptions(self, database: MainDatabase) -> None:
+        """Add redemptions made since the index was last updated, including those from other gates."""
+        rows = database.return_redemptions_after(self.latest_redemption_id)
+        with self.index_lock:
+            self.update_day()
+            for redemption_id, ticket_id, date_redeemed, guests in rows:
+                self.latest_redemption_id = max(self.latest_redemption_id, redemption_id)
+                if ticket_id in self.redeemed_tickets:   #admitted by this gate, already counted
+                    continue
+
+                self.redeemed_tickets.add(ticket_id)
+                if date_redeemed >= self.headcount_day:
+                    self.headcount += guests
+
+    def add_ticket(self) -> None:
+        """Update the index after this kiosk sells a ticket, including any sold elsewhere in between."""
+        self.refresh_tickets(self.main_database)
+
+    def ticket_code(self, ticket_id: int) -> str:
+        """Return the printable code for a ticket, made from its id and a signature."""
+        return f"{ticket_id}-{self.signature(ticket_id)}"
+
+    def signature(self, ticket_id: int) -> str:
+        """Return the signature for a ticket id."""
+        return hmac.new(self.secret, str(ticket_id).encode("utf-8"), hashlib.sha256).hexdigest()[:self.CODE_LENGTH].upper()
+
+    def current_day(self) -> int:
+        """Return the UNIX time at the start of the current day (GMT)."""
+        return int(time.time()) // 86400 * 86400
+
+    def update_day(self) -> None:
+        """Reset the headcount if a new day has started."""
+        if time.time() - self.headcount_day >= 86400:
+            self.headcount_day = self.current_day()
+            self.headcount = 0
+
+    def current_headcount(self) -> int:
+        """Return the number of guests admitted today."""
+        with self.index_lock:
+            self.update_day()
+            return self.headcount
+
+    def check_in(self, code: str) -> str:
+        """Validate and redeem a ticket code. Returns one of
+        "invalid", "unknown", "redeemed" or "admitted".
+        """
+        ticket_id, _, signature = code.strip().upper().partition("-")
+        if (not ticket_id.isdecimal() or len(ticket_id) > self.MAXIMUM_ID_LENGTH
+            or not hmac.compare_digest(signature.encode("utf-8"), self.signature(int(ticket_id)).encode("utf-8"))):
+            return "invalid"
+
+        ticket_id = int(ticket_id)
+        if ticket_id not in self.valid_tickets:   #signature is valid, so it may have been sold by another kiosk
+            self.refresh_tickets(self.main_database)
+
+        with self.index_lock:
+            if ticket_id not in self.valid_tickets:
+                return "unknown"
+
+            if ticket_id in self.redeemed_tickets:
+                return "redeemed"
+
+            self.update_day()
+            self.redeemed_tickets.add(ticket_id)
+            self.headcount += self.valid_tickets[ticket_id]
+            self.pending_redemptions.append((ticket_id, int(time.time())))
+            if len(self.pending_redemptions) >= self.REDEMPTION_BATCH_SIZE:
+                self.sync_event.set()
+
+        return "admitted"
+
+    def sync_loop(self) -> None:
+        """Background thread which writes pending redemptions and refreshes the index
+        every sync interval, or sooner when a batch is full.
+        """
+        sync_database = MainDatabase()
+        try:   #connect directly, as connect_database exits the program on failure
+            sync_database.database_connection = sqlite3.connect(sync_database.DATABASE_NAME)
+            sync_database.database_cursor = sync_database.database_connection.cursor()
+        except Exception as error:
+            self.sync_error = f"Unable to connect to database: {error}"
+            return
+
+        while True:
+            self.sync_event.wait(self.SYNC_INTERVAL)
+            self.sync_event.clear()
+            try:
+                self.flush_redemptions(sync_database)
+                self.refresh_tickets(sync_database)
+                self.refresh_redemptions(sync_database)
+                self.sync_error = ""
+            except Exception as error:   #pending redemptions are kept and retried next interval
+                self.sync_error = str(error)
+
+            if self.stopping:
+                break
+
+        sync_database.database_connection.close()
+
+    def sync_status(self) -> str:
+        """Return a warning if redemptions are not being saved, or an empty string if syncing normally."""
+        if self.sync_thread and not self.sync_thread.is_alive() and not self.stopping:
+            return f"Warning: gate sync has stopped, redemptions are not being saved. {self.sync_error}"
+
+        if self.sync_error:
+            return f"Warning: gate sync failing, {len(self.pending_redemptions)} redemption/s not saved. {self.sync_error}"
+
+        return ""
+
+    def flush_redemptions(self, database: MainDatabase) -> None:
+        """Write pending redemptions to the database, putting them back if the write fails."""
+        with self.index_lock:
+            redemptions = self.pending_redemptions
+            self.pending_redemptions = []
+
+        if not redemptions:
+            return
+
+        try:
+            inserted = database.add_redemptions(redemptions)
+        except Exception:
+            with self.index_lock:
+                self.pending_redemptions = redemptions + self.pending_redemptions
+            raise
+
+        with self.index_lock:
+            self.duplicate_admissions += len(redemptions) - inserted
@@ -4,6 +4,7 @@ import getpass
 import hashlib
 import sqlite3
 import time
+from datetime import datetime
 
 from .display import (
     clear_screen,
@@ -15,7 +16,7 @@ from .display import (
 
 class UserPortal():
     """Main class for user portal and login functions."""
-    def __init__(self, main_database: sqlite3.Connection):
+    def __init__(self, main_database: sqlite3.Connection, gate_object):
         """Initialisation for variables."""
         #command variables
         self.commands = {
@@ -23,10 +24,11 @@ class UserPortal():
             "exit": [], 
             "help": [], 
             "prices": ["-l", "--list", "-u", "--update"], 
-            "tickets": ["-l", "--list"],
+            "tickets": ["-l", "--list", "-f", "--follow"],
             "clear": [],
             "passwd": [],
-            "users": ["-l", "--list", "-a", "--add", "-d", "--delete", "-u", "--update"]
+            "users": ["-l", "--list", "-a", "--add", "-d", "--delete", "-u", "--update"],
+            "gate": ["-c", "--checkin", "-s", "--status"],
             }   #command, args
         self.command_help = {
             "shutdown": ["Shutdown the system."], 
@@ -40,6 +42,7 @@ class UserPortal():
 
             "tickets": [
                 "-l, --list  List [x] most recent ticket records.",
+                "-f, --follow  Show new ticket records as they are sold.",
                 ], 
             "clear": ["Clears the screen."],
             "passwd": ["Change the password for the current user."],
@@ -48,13 +51,26 @@ class UserPortal():
                 "-a, --add  Add a user to the system.",
                 "-d, --delete  Delete a user from the system.",
                 "-u, --update  Update the current user's username.",
-                ]
+                ],
+            "gate": [
+                "-c, --checkin  Scan ticket codes to check guests in.",
+                "-s, --status  Show the number of guests checked in today.",
+                ],
+            }
+        self.check_in_messages = {
+            "invalid": "Invalid ticket code.",
+            "unknown": "Ticket not found.",
+            "redeemed": "Ticket already redeemed.",
             }
         
         #login and user portal variables
         self.current_user = ""
         self.current_privilege = None   #1: admin, 0: standard
 
+        #follow variables
+        self.follow_poll_interval = 1   #seconds
+        self.follow_batch_size = 100   #maximum rows fetched per poll
+
         self.power_off = False
         self.login_attempts = 0
         self.login_cooldown = 10 * 60   #seconds
@@ -62,6 +78,7 @@ class UserPortal():
 
         self.main_database = main_database
         self.entrance_prices = self.main_database.entrance_prices
+        self.gate_object = gate_object
 
     def login(self) -> bool:
         """Verify a user with a username and password."""
@@ -106,6 +123,50 @@ class UserPortal():
         self.current_user_privilege = user_row[4]
         return True
     
+    def follow_tickets(self) -> None:
+        """Print tickets as they are sold, with running totals for the current minute.
+        Only rows newer than the last one seen are queried, so polling costs almost nothing when idle.
+        """
+        latest_row = self.main_database.return_tickets(1)
+        last_id = latest_row[0][0] if latest_row else 0   #high-water mark
+        current_minute = None
+        minute_tickets = 0
+        minute_guests = 0
+        minute_revenue = 0
+
+        print("Following new tickets. Press Ctrl+C to stop.")
+        print()
+        try:
+            while True:
+                rows = self.main_database.return_tickets_after(last_id, self.follow_batch_size)
+                if not rows:
+                    time.sleep(self.follow_poll_interval)
+                    continue
+
+                for row in rows:
+                    ticket_minute = row[8] // 60
+                    if ticket_minute != current_minute:   #new minute, reset totals
+                        current_minute = ticket_minute
+                        minute_tickets = 0
+                        minute_guests = 0
+                        minute_revenue = 0
+
+                    guests = row[1] + row[2] + row[3]
+                    minute_tickets += 1
+                    minute_guests += guests
+                    minute_revenue += row[7]
+
+                    time_ordered = datetime.utcfromtimestamp(row[8]).strftime("%H:%M:%S")
+                    print(f"{time_ordered} Ticket {row[0]} : {row[5]}, {guests} guest/s, £{row[7]:.2f}"
+                          + f" | this minute: {minute_tickets} ticket/s, {minute_guests} guest/s, £{minute_revenue:.2f}")
+
+                last_id = rows[-1][0]
+
+        except KeyboardInterrupt:
+            print()
+            print("Stopped following tickets.")
+            print()
+
     def user_portal(self) -> None:
         """A shell for a user to execute commands. The admin user will have escalated privileges."""
         print()
@@ -201,6 +262,9 @@ class UserPortal():
                         display_ticket(values, slow_type=False)
                         print()
 
+                elif "-f" in arguments or "--follow" in arguments:
+                    self.follow_tickets()
+
             elif main_command == "clear":
                 clear_screen()
 
@@ -310,4 +374,34 @@ class UserPortal():
                     self.current_user = new_username
 
                     print("Username updated.")
+                    print()
+
+            elif main_command == "gate":
+                if "-c" in arguments or "--checkin" in arguments:
+                    print("Scan ticket codes to check in. Enter a blank code to stop.")
+                    print()
+                    while True:
+                        sync_status = self.gate_object.sync_status()
+                        if sync_status:
+                            print(sync_status)
+
+                        code = input("Ticket code: ").strip()
+                        if not code:
+                            break
+
+                        result = self.gate_object.check_in(code)
+                        if result == "admitted":
+                            print(f"Admitted. Guests checked in today: {self.gate_object.headcount}")
+                        else:
+                            print(self.check_in_messages[result])
+
+                    print()
+
+                elif "-s" in arguments or "--status" in arguments:
+                    print(f"Guests checked in today: {self.gate_object.current_headcount()}")
+                    sync_status = self.gate_object.sync_status()
+                    if sync_status:
+                        print(sync_status)
+                    if self.gate_object.duplicate_admissions:
+                        print(f"Tickets also redeemed at another gate: {self.gate_object.duplicate_admissions}")
                     print()
\ No newline at end of file